@@ -468,7 +468,7 @@ def get_library_team(library_key):
     ref = ContentLibrary.objects.get_by_key(library_key)
     return [
         ContentLibraryPermissionEntry(user=entry.user, group=entry.group, access_level=entry.access_level)
-        for entry in ref.permission_grants.all()
+        for entry in ref.permission_grants.select_related('user', 'group')
     ]
 
 
@@ -993,7 +993,7 @@ def get_bundle_links(library_key):
     bundle_uuids = {link_data.bundle_uuid for link_data in links.values()}
     libraries_linked = {
         lib.bundle_uuid: lib
-        for lib in ContentLibrary.objects.select_related('org').filter(bundle_uuid__in=bundle_uuids)
+        for lib in ContentLibrary.objects.filter(bundle_uuid__in=bundle_uuids)
     }
     for link_name, link_data in links.items():
         # Is this linked bundle a content library?
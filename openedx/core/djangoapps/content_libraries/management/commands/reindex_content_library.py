@@ -66,7 +66,7 @@ class Command(BaseCommand):
         if options['all']:
             if options['force'] or query_yes_no(self.CONFIRMATION_PROMPT_ALL, default="no"):
                 logging.info("Indexing all libraries")
-                library_keys = [library.library_key for library in ContentLibrary.objects.all()]
+                library_keys = [library.library_key for library in ContentLibrary.objects.for_list()]
             else:
                 return
         else:
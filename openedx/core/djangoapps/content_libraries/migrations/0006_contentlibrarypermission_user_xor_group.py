@@ -0,0 +1,17 @@
+# Generated by Django 2.2.24 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_libraries', '0005_contentlibraryblockimporttask'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='contentlibrarypermission',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('user__isnull', False), ('group__isnull', True)), models.Q(('user__isnull', True), ('group__isnull', False)), _connector='OR'), name='clp_user_xor_group'),
+        ),
+    ]
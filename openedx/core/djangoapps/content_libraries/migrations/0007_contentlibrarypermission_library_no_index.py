@@ -0,0 +1,19 @@
+# Generated by Django 2.2.24 on 2026-10-15 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_libraries', '0006_contentlibrarypermission_user_xor_group'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contentlibrarypermission',
+            name='library',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='permission_grants', to='content_libraries.ContentLibrary'),
+        ),
+    ]
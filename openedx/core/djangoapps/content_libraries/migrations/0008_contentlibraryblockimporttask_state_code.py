@@ -0,0 +1,76 @@
+# Generated by Django 2.2.24 on 2026-10-15 12:00
+
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+BATCH_SIZE = 1000
+
+STATE_CODES = {
+    'created': 0,
+    'pending': 1,
+    'running': 2,
+    'failed': 3,
+    'successful': 4,
+}
+CODE_STATES = {code: state for state, code in STATE_CODES.items()}
+
+
+def _batched_pks(model):
+    pks = list(model.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(pks), BATCH_SIZE):
+        yield pks[start:start + BATCH_SIZE]
+
+
+def _check_known_values(model, field, known_values):
+    """
+    Refuse to convert rows holding a value that has no counterpart.
+    """
+    unknown = list(
+        model.objects.exclude(**{f'{field}__in': list(known_values)}).values_list(field, flat=True).distinct()[:10]
+    )
+    if unknown:
+        raise ValueError(f"Unknown import task {field} values: {unknown}")
+
+
+def state_to_code(apps, schema_editor):
+    """
+    Copy the string task states into the integer state column.
+    """
+    ContentLibraryBlockImportTask = apps.get_model('content_libraries', 'ContentLibraryBlockImportTask')
+    _check_known_values(ContentLibraryBlockImportTask, 'state', STATE_CODES)
+    state_code = Case(
+        *[When(state=state, then=Value(code)) for state, code in STATE_CODES.items()],
+        output_field=models.PositiveSmallIntegerField(),
+    )
+    for pks in _batched_pks(ContentLibraryBlockImportTask):
+        ContentLibraryBlockImportTask.objects.filter(pk__in=pks).update(state_code=state_code)
+
+
+def code_to_state(apps, schema_editor):
+    """
+    Copy the integer task states back into the string state column.
+    """
+    ContentLibraryBlockImportTask = apps.get_model('content_libraries', 'ContentLibraryBlockImportTask')
+    _check_known_values(ContentLibraryBlockImportTask, 'state_code', CODE_STATES)
+    state = Case(
+        *[When(state_code=code, then=Value(state)) for code, state in CODE_STATES.items()],
+        output_field=models.CharField(),
+    )
+    for pks in _batched_pks(ContentLibraryBlockImportTask):
+        ContentLibraryBlockImportTask.objects.filter(pk__in=pks).update(state=state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_libraries', '0007_contentlibrarypermission_library_no_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentlibraryblockimporttask',
+            name='state_code',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Task was created, but not queued to run.'), (1, 'Task was created and queued to run.'), (2, 'Task is running.'), (3, 'Task finished, but some blocks failed to import.'), (4, 'Task finished successfully.')], default=0, help_text='The state of the block import task.', verbose_name='state'),
+        ),
+        migrations.RunPython(state_to_code, code_to_state),
+    ]
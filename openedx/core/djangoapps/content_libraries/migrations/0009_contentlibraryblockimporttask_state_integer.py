@@ -0,0 +1,22 @@
+# Generated by Django 2.2.24 on 2026-10-15 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_libraries', '0008_contentlibraryblockimporttask_state_code'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='contentlibraryblockimporttask',
+            name='state',
+        ),
+        migrations.RenameField(
+            model_name='contentlibraryblockimporttask',
+            old_name='state_code',
+            new_name='state',
+        ),
+    ]
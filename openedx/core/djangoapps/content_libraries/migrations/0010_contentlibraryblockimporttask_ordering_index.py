@@ -0,0 +1,23 @@
+# Generated by Django 2.2.24 on 2026-10-15 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_libraries', '0009_contentlibraryblockimporttask_state_integer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contentlibraryblockimporttask',
+            index=models.Index(fields=['library', '-created_at', '-updated_at'], name='clbit_lib_created_updated_idx'),
+        ),
+        migrations.AlterField(
+            model_name='contentlibraryblockimporttask',
+            name='library',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='import_tasks', to='content_libraries.ContentLibrary'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.24 on 2026-10-15 12:00
+
+from django.db import migrations
+from opaque_keys.edx.django.models import CourseKeyField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_libraries', '0010_contentlibraryblockimporttask_ordering_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contentlibraryblockimporttask',
+            name='course_id',
+            field=CourseKeyField(help_text='ID of the imported course.', max_length=255, verbose_name='course ID'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.24 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_libraries', '0011_contentlibraryblockimporttask_course_id_no_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contentlibrary',
+            name='id',
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='contentlibraryblockimporttask',
+            name='id',
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='contentlibrarypermission',
+            name='id',
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+    ]
@@ -3,11 +3,15 @@ Models for new Content Libraries.
 """
 
 import contextlib
+import time
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
 
 from opaque_keys.edx.django.models import CourseKeyField
@@ -21,15 +25,52 @@ from organizations.models import Organization  # lint-amnesty, pylint: disable=w
 User = get_user_model()
 
 
+@contextlib.contextmanager
+def _relaxed_durability_atomic():
+    """
+    A transaction whose commit doesn't wait for the WAL to be flushed to disk,
+    on PostgreSQL.
+
+    Writes made in it can be lost if the database server crashes right after
+    the commit, but are never left half-applied, and any later regular commit
+    makes them durable too. This only applies when the transaction isn't
+    nested in another one.
+    """
+    relax_durability = connection.vendor == 'postgresql' and not connection.in_atomic_block
+    with transaction.atomic():
+        if relax_durability:
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL synchronous_commit = off")
+        yield
+
+
 class ContentLibraryManager(models.Manager):
     """
     Custom manager for ContentLibrary class.
+
+    The organization is always fetched along with the library, since it is
+    needed to build the library key. Code listing libraries should go through
+    ``ContentLibrary.objects`` so that it doesn't issue one query per library.
     """
+    def get_queryset(self):
+        return super().get_queryset().select_related('org')
+
+    def for_list(self):
+        """
+        Get a queryset of libraries that only loads the fields needed to list
+        them: their key and type.
+        """
+        return self.get_queryset().only('id', 'slug', 'type', 'org', 'org__short_name')
+
     def get_by_key(self, library_key):
         """
-        Get the ContentLibrary for the given LibraryLocatorV2 key.
+        Get the ContentLibrary for the given LibraryLocatorV2 key, or its
+        string form.
         """
-        assert isinstance(library_key, LibraryLocatorV2)
+        if isinstance(library_key, str):
+            library_key = LibraryLocatorV2.from_string(library_key)
+        elif not isinstance(library_key, LibraryLocatorV2):
+            raise TypeError(f"Expected a LibraryLocatorV2, got {library_key!r}")
         return self.get(org__short_name=library_key.org, slug=library_key.slug)
 
 
@@ -45,7 +86,7 @@ class ContentLibrary(models.Model):
     """
     objects = ContentLibraryManager()
 
-    id = models.AutoField(primary_key=True)
+    id = models.BigAutoField(primary_key=True)
     # Every Library is uniquely and permanently identified by an 'org' and a
     # 'slug' that are set during creation/import. Both will appear in the
     # library's opaque key:
@@ -80,10 +121,39 @@ class ContentLibrary(models.Model):
         verbose_name_plural = "Content Libraries"
         unique_together = ("org", "slug")
 
-    @property
+    @classmethod
+    def with_permissions(cls):
+        """
+        Get a queryset of libraries with their permission grants prefetched.
+
+        The grants, along with their users and groups, are available as the
+        ``prefetched_permissions`` list on each library.
+        """
+        return cls.objects.prefetch_related(Prefetch(
+            'permission_grants',
+            queryset=ContentLibraryPermission.objects.select_related('user', 'group'),
+            to_attr='prefetched_permissions',
+        ))
+
+    @classmethod
+    def stream(cls, chunk_size=2000):
+        """
+        Iterate over all libraries without caching them in a queryset.
+
+        Rows are fetched from the database chunk_size at a time (using a
+        server-side cursor where the database supports it), so callers should
+        not keep references to the yielded libraries once they're done with
+        them.
+        """
+        return cls.objects.iterator(chunk_size=chunk_size)
+
+    @cached_property
     def library_key(self):
         """
         Get the LibraryLocatorV2 opaque key for this library
+
+        The org and slug never change once a library is created, so the key is
+        only built once per instance.
         """
         return LibraryLocatorV2(org=self.org.short_name, slug=self.slug)
 
@@ -95,7 +165,13 @@ class ContentLibraryPermission(models.Model):
     """
     Row recording permissions for a content library
     """
-    library = models.ForeignKey(ContentLibrary, on_delete=models.CASCADE, related_name="permission_grants")
+    id = models.BigAutoField(primary_key=True)
+
+    # Lookups by library are served by the ('library', ...) unique indexes
+    # below, so the foreign key doesn't need an index of its own.
+    library = models.ForeignKey(
+        ContentLibrary, on_delete=models.CASCADE, related_name="permission_grants", db_index=False,
+    )
     # One of the following must be set (but not both):
     user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE)
     group = models.ForeignKey(Group, null=True, blank=True, on_delete=models.CASCADE)
@@ -116,13 +192,24 @@ class ContentLibraryPermission(models.Model):
             ('library', 'user'),
             ('library', 'group'),
         ]
+        constraints = [
+            # One and only one of 'user' and 'group' must be set.
+            models.CheckConstraint(
+                name='clp_user_xor_group',
+                check=(
+                    (Q(user__isnull=False) & Q(group__isnull=True)) |
+                    (Q(user__isnull=True) & Q(group__isnull=False))
+                ),
+            ),
+        ]
 
     def save(self, *args, **kwargs):  # lint-amnesty, pylint: disable=arguments-differ, signature-differs
         """
         Validate any constraints on the model.
 
-        We can remove this and replace it with a proper database constraint
-        once we're upgraded to Django 2.2+
+        The check constraint above isn't enforced by MySQL 5.7, so this is also
+        checked here. bulk_create() doesn't call save(): callers creating
+        permissions in bulk must validate them first.
         """
         # if both are nonexistent or both are existing, error
         if (not self.user) == (not self.group):
@@ -139,17 +226,22 @@ class ContentLibraryBlockImportTask(models.Model):
     Model of a task to import blocks from an external source (e.g. modulestore).
     """
 
+    id = models.BigAutoField(primary_key=True)
+
+    # Lookups by library are served by the ('library', ...) index below, so
+    # the foreign key doesn't need an index of its own.
     library = models.ForeignKey(
         ContentLibrary,
         on_delete=models.CASCADE,
         related_name='import_tasks',
+        db_index=False,
     )
 
-    TASK_CREATED = 'created'
-    TASK_PENDING = 'pending'
-    TASK_RUNNING = 'running'
-    TASK_FAILED = 'failed'
-    TASK_SUCCESSFUL = 'successful'
+    TASK_CREATED = 0
+    TASK_PENDING = 1
+    TASK_RUNNING = 2
+    TASK_FAILED = 3
+    TASK_SUCCESSFUL = 4
 
     TASK_STATE_CHOICES = (
         (TASK_CREATED, _('Task was created, but not queued to run.')),
@@ -159,10 +251,18 @@ class ContentLibraryBlockImportTask(models.Model):
         (TASK_SUCCESSFUL, _('Task finished successfully.')),
     )
 
-    state = models.CharField(
+    # Names used for the task states by the REST API.
+    TASK_STATE_NAMES = {
+        TASK_CREATED: 'created',
+        TASK_PENDING: 'pending',
+        TASK_RUNNING: 'running',
+        TASK_FAILED: 'failed',
+        TASK_SUCCESSFUL: 'successful',
+    }
+
+    state = models.PositiveSmallIntegerField(
         choices=TASK_STATE_CHOICES,
         default=TASK_CREATED,
-        max_length=30,
         verbose_name=_('state'),
         help_text=_('The state of the block import task.'),
     )
@@ -173,9 +273,9 @@ class ContentLibraryBlockImportTask(models.Model):
         help_text=_('A float from 0.0 to 1.0 representing the task progress.'),
     )
 
+    # Import tasks are never looked up by course, so this isn't indexed.
     course_id = CourseKeyField(
         max_length=255,
-        db_index=True,
         verbose_name=_('course ID'),
         help_text=_('ID of the imported course.'),
     )
@@ -184,30 +284,102 @@ class ContentLibraryBlockImportTask(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Progress is only written to the database once it has moved by at least
+    # PROGRESS_FLUSH_DELTA, or PROGRESS_FLUSH_INTERVAL seconds have elapsed
+    # since the last write, so that per-block progress reports do not issue one
+    # UPDATE per block.
+    PROGRESS_FLUSH_DELTA = 0.01
+    PROGRESS_FLUSH_INTERVAL = 5
+
+    _last_flushed_progress = None
+    _last_flush_ts = None
+
     class Meta:
         ordering = ['-created_at', '-updated_at']
+        indexes = [
+            # Import tasks are listed per library, in the default ordering.
+            models.Index(fields=['library', '-created_at', '-updated_at'], name='clbit_lib_created_updated_idx'),
+        ]
 
     @classmethod
-    @contextlib.contextmanager
     def execute(cls, import_task_id):
         """
         A context manager to manage a task that is being executed.
         """
-        self = cls.objects.get(pk=import_task_id)
-        self.state = self.TASK_RUNNING
-        self.save()
-        try:
-            yield self
-            self.state = self.TASK_SUCCESSFUL
-        except:  # pylint: disable=broad-except
-            self.state = self.TASK_FAILED
-            raise
-        finally:
-            self.save()
-
-    def save_progress(self, progress):
+        return _ImportTaskExecution(cls, import_task_id)
+
+    def save_progress(self, progress, force=False):
+        """
+        Record the task progress, writing it to the database only when it has
+        changed enough since the last write (or when ``force`` is set).
+        """
         self.progress = progress
-        self.save(update_fields=['progress', 'updated_at'])
+        if not (force or self._should_flush_progress()):
+            return
+        # Losing an intermediate progress update in a database crash is
+        # harmless, so don't wait for it to reach the disk. The final state and
+        # progress are written with a regular commit by execute().
+        with _relaxed_durability_atomic():
+            self._update_fields(progress=progress)
+        self._mark_progress_flushed()
+
+    def _update_fields(self, **fields):
+        """
+        Write only the given fields (and the update time) to the database.
+
+        This skips serializing the whole row and the model save signals.
+        """
+        # The update time comes from Python, like created_at, rather than from
+        # the database's CURRENT_TIMESTAMP: on MySQL and SQLite that only has
+        # second precision, and MySQL uses the session time zone, so it could
+        # end up before created_at.
+        fields['updated_at'] = timezone.now()
+        type(self).objects.filter(pk=self.pk).update(**fields)
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def _should_flush_progress(self):
+        """
+        Whether the in-memory progress should be written to the database.
+        """
+        if self._last_flush_ts is None:
+            return True
+        if abs(self.progress - self._last_flushed_progress) >= self.PROGRESS_FLUSH_DELTA:
+            return True
+        return time.monotonic() - self._last_flush_ts > self.PROGRESS_FLUSH_INTERVAL
+
+    def _mark_progress_flushed(self):
+        self._last_flushed_progress = self.progress
+        self._last_flush_ts = time.monotonic()
 
     def __str__(self):
         return f'{self.course_id} to {self.library} #{self.pk}'
+
+
+class _ImportTaskExecution:
+    """
+    Context manager returned by ContentLibraryBlockImportTask.execute().
+
+    It marks the task as running on enter, then flushes any buffered progress
+    and marks the task as successful or failed on exit.
+    """
+
+    def __init__(self, task_cls, import_task_id):
+        self.task_cls = task_cls
+        self.import_task_id = import_task_id
+        self.import_task = None
+
+    def __enter__(self):
+        import_task = self.task_cls.objects.get(pk=self.import_task_id)
+        import_task._update_fields(state=import_task.TASK_RUNNING)  # pylint: disable=protected-access
+        import_task._mark_progress_flushed()  # pylint: disable=protected-access
+        self.import_task = import_task
+        return import_task
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        import_task = self.import_task
+        state = import_task.TASK_FAILED if exc_type else import_task.TASK_SUCCESSFUL
+        # Also flush any buffered progress along with the final state.
+        import_task._update_fields(state=state, progress=import_task.progress)  # pylint: disable=protected-access
+        import_task._mark_progress_flushed()  # pylint: disable=protected-access
+        return False
@@ -208,10 +208,14 @@ class ContentLibraryBlockImportTaskSerializer(serializers.ModelSerializer):
     """
 
     org = serializers.SerializerMethodField()
+    state = serializers.SerializerMethodField()
 
     def get_org(self, obj):
         return obj.course_id.org
 
+    def get_state(self, obj):
+        return obj.TASK_STATE_NAMES[obj.state]
+
     class Meta:
         model = ContentLibraryBlockImportTask
         fields = '__all__'
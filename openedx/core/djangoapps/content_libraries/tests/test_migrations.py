@@ -0,0 +1,47 @@
+"""
+Tests for Content Library data migrations.
+"""
+
+from importlib import import_module
+from unittest import mock
+
+from django.test import TestCase
+
+from ..models import ContentLibraryBlockImportTask
+
+state_code_migration = import_module(
+    'openedx.core.djangoapps.content_libraries.migrations.0008_contentlibraryblockimporttask_state_code'
+)
+
+
+class ImportTaskStateCodeMigrationTest(TestCase):
+    """
+    Tests for the migration of import task states from strings to integers.
+    """
+
+    def test_state_codes_match_model(self):
+        """
+        The codes written by the migration are the ones used by the model.
+        """
+        assert state_code_migration.STATE_CODES == {
+            name: code for code, name in ContentLibraryBlockImportTask.TASK_STATE_NAMES.items()
+        }
+
+    def test_state_codes_round_trip(self):
+        """
+        Every string state converts to a code and back to the same state.
+        """
+        for state, code in state_code_migration.STATE_CODES.items():
+            assert state_code_migration.CODE_STATES[code] == state
+
+    def test_unknown_state(self):
+        """
+        Given a row with an unknown state,
+        Then the migration fails instead of rewriting it.
+        """
+        apps = mock.Mock()
+        model = apps.get_model.return_value
+        model.objects.exclude.return_value.values_list.return_value.distinct.return_value = ['bogus']
+        with self.assertRaises(ValueError):
+            state_code_migration.state_to_code(apps, None)
+        model.objects.filter.return_value.update.assert_not_called()
@@ -0,0 +1,323 @@
+"""
+Tests for Content Library models.
+"""
+
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import TestCase, skipUnlessDBFeature
+from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.locator import LibraryLocatorV2
+from organizations.models import Organization
+
+from common.djangoapps.student.tests.factories import UserFactory
+
+from ..models import ContentLibrary, ContentLibraryBlockImportTask, ContentLibraryPermission
+from ..serializers import ContentLibraryBlockImportTaskSerializer
+
+
+class ContentLibraryBlockImportTaskTest(TestCase):
+    """
+    Tests for ContentLibraryBlockImportTask.
+    """
+
+    def setUp(self):
+        super().setUp()
+        org = Organization.objects.create(short_name='TestOrg', name='Test Org')
+        self.library = ContentLibrary.objects.create(org=org, slug='test-lib', bundle_uuid=uuid.uuid4())
+        self.import_task = ContentLibraryBlockImportTask.objects.create(
+            library=self.library,
+            course_id=CourseKey.from_string('course-v1:TestOrg+TestCourse+Run'),
+        )
+
+    def _stored_progress(self):
+        return ContentLibraryBlockImportTask.objects.get(pk=self.import_task.pk).progress
+
+    def test_execute_successful(self):
+        """
+        Given a task that is executed without errors,
+        Then it is marked as running and then successful.
+        """
+        with ContentLibraryBlockImportTask.execute(self.import_task.pk) as import_task:
+            assert import_task.state == ContentLibraryBlockImportTask.TASK_RUNNING
+            self.import_task.refresh_from_db()
+            assert self.import_task.state == ContentLibraryBlockImportTask.TASK_RUNNING
+        assert import_task.state == ContentLibraryBlockImportTask.TASK_SUCCESSFUL
+        self.import_task.refresh_from_db()
+        assert self.import_task.state == ContentLibraryBlockImportTask.TASK_SUCCESSFUL
+
+    def test_execute_failed(self):
+        """
+        Given a task that raises while executed,
+        Then it is marked as failed and the exception propagates.
+        """
+        with self.assertRaises(ValueError):
+            with ContentLibraryBlockImportTask.execute(self.import_task.pk):
+                raise ValueError
+        self.import_task.refresh_from_db()
+        assert self.import_task.state == ContentLibraryBlockImportTask.TASK_FAILED
+
+    def test_serialized_state(self):
+        """
+        Given a task that was executed successfully,
+        Then the REST API reports its state by name.
+        """
+        with ContentLibraryBlockImportTask.execute(self.import_task.pk):
+            pass
+        self.import_task.refresh_from_db()
+        assert ContentLibraryBlockImportTaskSerializer(self.import_task).data['state'] == 'successful'
+
+    def _stored_updated_at(self):
+        return ContentLibraryBlockImportTask.objects.get(pk=self.import_task.pk).updated_at
+
+    def test_execute_sets_updated_at(self):
+        """
+        Given a task that is executed,
+        Then its update time advances on each state change.
+        """
+        started = self.import_task.updated_at + timedelta(minutes=1)
+        finished = started + timedelta(minutes=1)
+        with mock.patch('django.utils.timezone.now', return_value=started) as mock_now:
+            with ContentLibraryBlockImportTask.execute(self.import_task.pk) as import_task:
+                assert self._stored_updated_at() == started
+                mock_now.return_value = finished
+        assert self._stored_updated_at() == finished
+        assert import_task.updated_at == finished
+
+    def test_save_progress_sets_updated_at(self):
+        """
+        Given a task whose progress is saved,
+        Then its update time advances.
+        """
+        later = self.import_task.updated_at + timedelta(minutes=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.import_task.save_progress(0.5)
+        assert self._stored_updated_at() == later
+
+    def test_save_after_save_progress_sets_updated_at(self):
+        """
+        Given a task whose progress was saved,
+        When it is later saved in full,
+        Then its update time still advances.
+        """
+        self.import_task.save_progress(0.5)
+        later = self.import_task.updated_at + timedelta(minutes=1)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.import_task.save()
+        assert self._stored_updated_at() == later
+
+    @mock.patch('openedx.core.djangoapps.content_libraries.models.connection')
+    def test_save_progress_relaxes_durability_on_postgresql(self, mock_connection):
+        """
+        Given a PostgreSQL database and no enclosing transaction,
+        When the progress is saved,
+        Then its commit doesn't wait for the WAL to be flushed.
+        """
+        mock_connection.vendor = 'postgresql'
+        mock_connection.in_atomic_block = False
+        self.import_task.save_progress(0.5)
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with("SET LOCAL synchronous_commit = off")
+        assert self._stored_progress() == 0.5
+
+    @mock.patch('openedx.core.djangoapps.content_libraries.models.connection')
+    def test_save_progress_keeps_durability(self, mock_connection):
+        """
+        Given another database, or an enclosing transaction,
+        When the progress is saved,
+        Then the commit settings are left alone.
+        """
+        for vendor, in_atomic_block in (('mysql', False), ('postgresql', True)):
+            mock_connection.reset_mock()
+            mock_connection.vendor = vendor
+            mock_connection.in_atomic_block = in_atomic_block
+            self.import_task.save_progress(0.5, force=True)
+            mock_connection.cursor.assert_not_called()
+
+    def test_save_progress_skips_small_changes(self):
+        """
+        Given a task that is being executed,
+        When the progress changes by less than the flush delta,
+        Then the stored progress is not updated until the task finishes.
+        """
+        with ContentLibraryBlockImportTask.execute(self.import_task.pk) as import_task:
+            import_task.save_progress(0.001)
+            assert self._stored_progress() == 0.0
+            import_task.save_progress(0.5)
+            assert self._stored_progress() == 0.5
+            import_task.save_progress(0.505)
+            assert self._stored_progress() == 0.5
+        assert self._stored_progress() == 0.505
+
+    def test_save_progress_flushes_after_interval(self):
+        """
+        Given a task that is being executed,
+        When the flush interval elapses,
+        Then a small progress change is stored.
+        """
+        with ContentLibraryBlockImportTask.execute(self.import_task.pk) as import_task:
+            with mock.patch('time.monotonic', return_value=import_task._last_flush_ts + 10):  # pylint: disable=protected-access
+                import_task.save_progress(0.001)
+            assert self._stored_progress() == 0.001
+
+    def test_save_progress_force(self):
+        """
+        Given a forced flush,
+        Then the progress is stored regardless of the change.
+        """
+        with ContentLibraryBlockImportTask.execute(self.import_task.pk) as import_task:
+            import_task.save_progress(0.001, force=True)
+            assert self._stored_progress() == 0.001
+
+
+class ContentLibraryManagerTest(TestCase):
+    """
+    Tests for ContentLibraryManager.
+    """
+
+    def setUp(self):
+        super().setUp()
+        org = Organization.objects.create(short_name='TestOrg', name='Test Org')
+        for slug in ('lib-a', 'lib-b', 'lib-c'):
+            ContentLibrary.objects.create(org=org, slug=slug, bundle_uuid=uuid.uuid4())
+
+    def test_listing_fetches_org(self):
+        """
+        When listing libraries and building their keys,
+        Then a single query is issued.
+        """
+        with self.assertNumQueries(1):
+            keys = [str(library.library_key) for library in ContentLibrary.objects.all()]
+        assert sorted(keys) == ['lib:TestOrg:lib-a', 'lib:TestOrg:lib-b', 'lib:TestOrg:lib-c']
+
+    def test_for_list(self):
+        """
+        When listing libraries for display,
+        Then their keys and types are loaded in a single query.
+        """
+        with self.assertNumQueries(1):
+            libraries = [(str(library.library_key), library.type) for library in ContentLibrary.objects.for_list()]
+        assert len(libraries) == 3
+
+    def test_get_by_key(self):
+        """
+        When looking up a library by key,
+        Then the library and its organization are fetched in a single query.
+        """
+        library_key = LibraryLocatorV2.from_string('lib:TestOrg:lib-b')
+        with self.assertNumQueries(1):
+            library = ContentLibrary.objects.get_by_key(library_key)
+        assert library.library_key == library_key
+
+    def test_get_by_key_string(self):
+        """
+        When looking up a library by the string form of its key,
+        Then the library is found.
+        """
+        library = ContentLibrary.objects.get_by_key('lib:TestOrg:lib-b')
+        assert str(library.library_key) == 'lib:TestOrg:lib-b'
+
+    def test_get_by_key_wrong_type(self):
+        """
+        Given a key that isn't a library key,
+        Then a TypeError is raised.
+        """
+        with self.assertRaises(TypeError):
+            ContentLibrary.objects.get_by_key(CourseKey.from_string('course-v1:TestOrg+TestCourse+Run'))
+
+    def test_stream(self):
+        """
+        When streaming all libraries,
+        Then they and their organizations are fetched in a single query.
+        """
+        with self.assertNumQueries(1):
+            keys = [str(library.library_key) for library in ContentLibrary.stream(chunk_size=2)]
+        assert sorted(keys) == ['lib:TestOrg:lib-a', 'lib:TestOrg:lib-b', 'lib:TestOrg:lib-c']
+
+
+class ContentLibraryPermissionTest(TestCase):
+    """
+    Tests for ContentLibraryPermission.
+    """
+
+    def setUp(self):
+        super().setUp()
+        org = Organization.objects.create(short_name='TestOrg', name='Test Org')
+        self.library = ContentLibrary.objects.create(org=org, slug='test-lib', bundle_uuid=uuid.uuid4())
+        self.user = UserFactory.create()
+        self.group = Group.objects.create(name='test-group')
+
+    def test_user_or_group_required(self):
+        """
+        Given a permission granted to neither a user nor a group,
+        Then it cannot be saved.
+        """
+        with self.assertRaises(ValidationError):
+            ContentLibraryPermission.objects.create(
+                library=self.library,
+                access_level=ContentLibraryPermission.READ_LEVEL,
+            )
+
+    def test_user_and_group_not_allowed(self):
+        """
+        Given a permission granted to both a user and a group,
+        Then it cannot be saved.
+        """
+        with self.assertRaises(ValidationError):
+            ContentLibraryPermission.objects.create(
+                library=self.library,
+                user=self.user,
+                group=self.group,
+                access_level=ContentLibraryPermission.READ_LEVEL,
+            )
+
+    @skipUnlessDBFeature('supports_table_check_constraints')
+    def test_check_constraint(self):
+        """
+        Given a permission granted to neither a user nor a group,
+        When it is created in bulk, bypassing save(),
+        Then the database constraint rejects it.
+        """
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                ContentLibraryPermission.objects.bulk_create([
+                    ContentLibraryPermission(library=self.library, access_level=ContentLibraryPermission.READ_LEVEL),
+                ])
+
+    def test_with_permissions(self):
+        """
+        When listing libraries with their permissions,
+        Then the number of queries doesn't depend on the number of grants.
+        """
+        ContentLibraryPermission.objects.create(
+            library=self.library, user=self.user, access_level=ContentLibraryPermission.ADMIN_LEVEL,
+        )
+        ContentLibraryPermission.objects.create(
+            library=self.library, group=self.group, access_level=ContentLibraryPermission.READ_LEVEL,
+        )
+        with self.assertNumQueries(2):
+            grants = [
+                str(grant)
+                for library in ContentLibrary.with_permissions()
+                for grant in library.prefetched_permissions
+            ]
+        assert len(grants) == 2
+
+    def test_bulk_create(self):
+        """
+        Given valid permissions,
+        Then they can be created in bulk.
+        """
+        ContentLibraryPermission.objects.bulk_create([
+            ContentLibraryPermission(
+                library=self.library, user=self.user, access_level=ContentLibraryPermission.ADMIN_LEVEL,
+            ),
+            ContentLibraryPermission(
+                library=self.library, group=self.group, access_level=ContentLibraryPermission.READ_LEVEL,
+            ),
+        ])
+        assert self.library.permission_grants.count() == 2